@@ -1,11 +1,18 @@
+import base64
 import os
 import re
-import secrets
-from pathlib import Path
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 
+import orjson
 from flask import (
     Flask,
+    Response,
+    g,
     jsonify,
     request,
     session,
@@ -13,34 +20,117 @@ from flask import (
     redirect,
     url_for,
 )
+from flask.json.provider import JSONProvider
+from werkzeug.security import check_password_hash, generate_password_hash
 from docker import from_env as docker_from_env
 from docker.errors import NotFound, APIError
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
 
 from config import Config
 from models import db, Server, User, Invite  # make sure models.py has User + Invite
 
 
-docker_client = docker_from_env()
+docker_client = docker_from_env(max_pool_size=Config.DOCKER_MAX_POOL_SIZE)
+
+# Transitional container status reported while a background action runs
+_ACTION_STATUS = {"stop": "stopping", "restart": "restarting"}
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_b64 = base64.urlsafe_b64encode
+
+# How many times create_server retries when another request grabs the same port block
+PORT_ALLOCATION_RETRIES = 5
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON via orjson. Datetimes serialize natively as ISO 8601 (same output
+    as .isoformat()), so models can hand them over as-is.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+
+def sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers run alongside a writer, and synchronous=NORMAL skips the
+    fsync on every commit (still durable across app crashes in WAL mode).
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
 
 
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     app.config.from_object(Config)
 
     db.init_app(app)
 
     with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            event.listen(db.engine, "connect", sqlite_pragmas)
         db.create_all()
+        # create_server's port-collision retry relies on base_port being unique
+        try:
+            for index in Server.__table__.indexes:
+                index.create(db.engine, checkfirst=True)
+        except IntegrityError as e:
+            app.logger.error(f"Could not enforce unique server ports: {e}")
+
+    # Once an admin exists it is never removed, so this only ever flips to True.
+    app.config["_HAS_ADMIN"] = False
+
+    # Last known container statuses, served stale-while-revalidate by list_servers
+    # ("gen" is bumped on invalidate so in-flight refreshes can't restore old data).
+    status_cache = {
+        "ts": 0.0,
+        "data": None,
+        "gen": 0,
+        "inflight": False,
+        "lock": threading.Lock(),
+    }
+    status_pool = ThreadPoolExecutor(max_workers=1)
+
+    # Runs container stop/restart so request workers aren't pinned on the daemon
+    docker_pool = ThreadPoolExecutor(max_workers=4)
+    # container_name -> transitional status while a background action runs
+    pending_actions = {}
+
+    # Filesystem teardown (deleting world data can take a long time)
+    io_pool = ThreadPoolExecutor(max_workers=4)
 
     # ------------------------------------------------------------------
     # Auth helpers
     # ------------------------------------------------------------------
 
     def current_user():
+        # Looked up at most once per request; g is reset for every request
+        if "user" in g:
+            return g.user
         uid = session.get("user_id")
-        if not uid:
-            return None
-        return User.query.get(uid)
+        g.user = db.session.get(User, uid) if uid else None
+        return g.user
+
+    def active_invite(token: str):
+        """Fetch an unused, unexpired invite in one query (None otherwise)."""
+        # token is UNIQUE, so this is a single index probe on its index
+        return Invite.query.filter(
+            Invite.token == token,
+            db.or_(Invite.used.is_(False), Invite.used.is_(None)),
+            db.or_(Invite.expires_at.is_(None), Invite.expires_at > datetime.utcnow()),
+        ).first()
 
     def login_required(role=None):
         """
@@ -51,15 +141,26 @@ def create_app():
         def decorator(f):
             @wraps(f)
             def wrapper(*args, **kwargs):
-                user = current_user()
-                if not user:
+                # Gate on the session alone; handlers that need the User
+                # object call current_user() themselves.
+                if not session.get("user_id"):
                     # For JSON API: return 401
                     if request.path.startswith("/api/"):
                         return jsonify({"error": "Authentication required"}), 401
                     # For HTML: redirect to login
                     return redirect(url_for("login_page"))
 
-                if role and user.role != role:
+                if role and "user_role" not in session:
+                    # Session from before the role was stored in it
+                    user = current_user()
+                    if not user:
+                        session.clear()
+                        if request.path.startswith("/api/"):
+                            return jsonify({"error": "Authentication required"}), 401
+                        return redirect(url_for("login_page"))
+                    session["user_role"] = user.role
+
+                if role and session["user_role"] != role:
                     if request.path.startswith("/api/"):
                         return (
                             jsonify({"error": "Insufficient permissions"}),
@@ -72,6 +173,12 @@ def create_app():
 
         return decorator
 
+    def has_admin() -> bool:
+        if not app.config["_HAS_ADMIN"]:
+            if User.query.filter_by(role="admin").count() > 0:
+                app.config["_HAS_ADMIN"] = True
+        return app.config["_HAS_ADMIN"]
+
     # ------------------------------------------------------------------
     # Global guards (first-time setup)
     # ------------------------------------------------------------------
@@ -89,7 +196,7 @@ def create_app():
         open_endpoints = {"setup_info", "setup_create_admin", "setup_page", "static"}
 
         # If an admin exists, do nothing
-        if User.query.filter_by(role="admin").count() > 0:
+        if has_admin():
             return
 
         # If no admin yet, allow only the setup endpoints/static
@@ -115,24 +222,79 @@ def create_app():
     # ------------------------------------------------------------------
 
     def slugify(name: str) -> str:
-        slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+        slug = _SLUG_RE.sub("-", name.lower()).strip("-")
         return slug or "server"
 
-    def allocate_port_block() -> int:
-        """Find a free base port in the configured pool."""
-        used_ports = {s.base_port for s in Server.query.all()}
-        start = app.config["VALHEIM_PORT_RANGE_START"]
-        end = app.config["VALHEIM_PORT_RANGE_END"]
-        step = app.config["VALHEIM_PORT_BLOCK_SIZE"]
+    # One byte per port block in the pool: 0 = free, 1 = taken.
+    # Built at startup, kept in sync on create/delete, and rebuilt from the
+    # database when it looks full.
+    port_start = app.config["VALHEIM_PORT_RANGE_START"]
+    port_step = app.config["VALHEIM_PORT_BLOCK_SIZE"]
+    port_slots = len(
+        range(port_start, app.config["VALHEIM_PORT_RANGE_END"], port_step)
+    )
+    port_bitmap = bytearray(port_slots)
+    port_lock = threading.Lock()
+
+    def port_slot(base_port: int):
+        offset = base_port - port_start
+        if offset < 0 or offset % port_step:
+            return None
+        idx = offset // port_step
+        return idx if idx < port_slots else None
+
+    def load_port_bitmap():
+        """Rebuild the bitmap from the database. Caller holds port_lock."""
+        port_bitmap[:] = bytes(port_slots)
+        for base_port in db.session.execute(select(Server.base_port)).scalars():
+            idx = port_slot(base_port)
+            if idx is not None:
+                port_bitmap[idx] = 1
 
-        for base in range(start, end, step):
-            if base not in used_ports:
-                return base
-        raise RuntimeError("No free ports left in pool")
+    with app.app_context(), port_lock:
+        load_port_bitmap()
+
+    def allocate_port_block() -> int:
+        """Reserve a free base port in the configured pool."""
+        with port_lock:
+            idx = port_bitmap.find(0)
+            if idx < 0:
+                # Slots may have been freed by another process, or left marked
+                # after losing an insert race; resync once before giving up.
+                load_port_bitmap()
+                idx = port_bitmap.find(0)
+            if idx < 0:
+                raise RuntimeError("No free ports left in pool")
+            port_bitmap[idx] = 1
+        return port_start + idx * port_step
+
+    def release_port_block(base_port: int):
+        """Return a base port to the pool."""
+        idx = port_slot(base_port)
+        if idx is not None:
+            with port_lock:
+                port_bitmap[idx] = 0
 
     def server_data_dir(slug: str) -> str:
-        root = Path(app.config["DATA_ROOT"])
-        return str(root.joinpath(slug))
+        return os.path.join(app.config["DATA_ROOT"], slug)
+
+    def remove_tree(path: str):
+        """Delete a directory tree on the IO pool, logging any failure."""
+
+        def job():
+            try:
+                shutil.rmtree(path)
+            except Exception as e:
+                app.logger.error(f"Failed to delete directory {path}: {e}")
+
+        io_pool.submit(job)
+
+    # Finish deletes that were interrupted before their rmtree completed
+    if os.path.isdir(app.config["DATA_ROOT"]):
+        for entry in os.scandir(app.config["DATA_ROOT"]):
+            if entry.name.startswith(".") and ".deleting-" in entry.name:
+                app.logger.info(f"Deleting leftover directory: {entry.path}")
+                remove_tree(entry.path)
 
     def get_container(container_name: str):
         try:
@@ -140,6 +302,86 @@ def create_app():
         except NotFound:
             return None
 
+    def fetch_container_statuses() -> dict:
+        # One daemon round-trip for all containers instead of one per server.
+        # sparse=True keeps docker-py from inspecting each listed container;
+        # sparse objects only carry the raw list attrs.
+        return {
+            c.attrs["Names"][0].lstrip("/"): c.attrs["State"]
+            for c in docker_client.containers.list(
+                all=True, sparse=True, filters={"name": "valpanel_"}
+            )
+        }
+
+    def store_statuses(data: dict, gen: int):
+        """Save a snapshot unless the cache was invalidated while fetching it."""
+        with status_cache["lock"]:
+            if status_cache["gen"] == gen:
+                status_cache["data"] = data
+                status_cache["ts"] = time.monotonic()
+
+    def refresh_status_cache(gen: int):
+        try:
+            store_statuses(fetch_container_statuses(), gen)
+        except Exception as e:
+            app.logger.error(f"Failed to refresh container statuses: {e}")
+        finally:
+            with status_cache["lock"]:
+                status_cache["inflight"] = False
+
+    def cached_container_statuses():
+        """
+        Return (statuses, age_seconds, stale).
+
+        Serves the last snapshot immediately and, once it is older than
+        STATUS_CACHE_TTL, schedules a single background refresh. An empty,
+        invalidated, or older-than-STATUS_CACHE_MAX_AGE cache makes the
+        caller wait on Docker instead.
+        """
+        cache = status_cache
+        with cache["lock"]:
+            data = cache["data"]
+            gen = cache["gen"]
+            age = time.monotonic() - cache["ts"]
+            if data is not None and age > app.config["STATUS_CACHE_MAX_AGE"]:
+                data = None
+            stale = data is not None and age > app.config["STATUS_CACHE_TTL"]
+            if stale and not cache["inflight"]:
+                cache["inflight"] = True
+                status_pool.submit(refresh_status_cache, gen)
+        if data is None:
+            data = fetch_container_statuses()
+            store_statuses(data, gen)
+            age = 0.0
+        return data, age, stale
+
+    def invalidate_status_cache():
+        with status_cache["lock"]:
+            status_cache["data"] = None
+            status_cache["gen"] += 1
+
+    def run_docker_action(container, action: str):
+        """Run a slow container action (stop/restart) on the background pool."""
+
+        def job():
+            try:
+                getattr(container, action)()
+            except APIError as e:
+                app.logger.error(
+                    f"Failed to {action} container {container.name}: {e.explanation}"
+                )
+            finally:
+                # Invalidate before clearing the pending status, so a list in
+                # between sees either "stopping"/"restarting" or fresh data.
+                invalidate_status_cache()
+                pending_actions.pop(container.name, None)
+
+        # Reported as the container status until the job finishes, so the
+        # dashboard can poll for the end of the action.
+        pending_actions[container.name] = _ACTION_STATUS[action]
+        invalidate_status_cache()
+        docker_pool.submit(job)
+
     def create_valheim_container(server: Server):
         """
         Create (or recover) a Valheim server container using lloesche/valheim-server.
@@ -157,39 +399,26 @@ def create_app():
         """
         image = app.config["VALHEIM_IMAGE"]
 
-        # Check for existing container
+        # Check for existing container. containers.get() already inspected it,
+        # so its status is current without another reload().
         existing = get_container(server.container_name)
         if existing is not None:
+            if existing.status not in ("created", "exited", "dead"):
+                app.logger.info(
+                    f"Container {server.container_name} exists and is running; reusing it."
+                )
+                return existing
+
+            app.logger.warning(
+                f"Removing stale container {server.container_name} (status={existing.status})"
+            )
             try:
-                existing.reload()
-            except APIError:
-                app.logger.warning(
-                    f"Failed to reload container {server.container_name}, removing it."
+                existing.remove(force=True)
+            except APIError as e:
+                app.logger.error(
+                    f"Could not remove stale container {server.container_name}: {e.explanation}"
                 )
-                try:
-                    existing.remove(force=True)
-                except APIError as e:
-                    app.logger.error(
-                        f"Could not remove existing container {server.container_name}: {e.explanation}"
-                    )
-                    raise
-            else:
-                if existing.status in ("created", "exited", "dead"):
-                    app.logger.warning(
-                        f"Removing stale container {server.container_name} (status={existing.status})"
-                    )
-                    try:
-                        existing.remove(force=True)
-                    except APIError as e:
-                        app.logger.error(
-                            f"Could not remove stale container {server.container_name}: {e.explanation}"
-                        )
-                        raise
-                else:
-                    app.logger.info(
-                        f"Container {server.container_name} exists and is running; reusing it."
-                    )
-                    return existing
+                raise
 
         # Allocate ports
         ports = {
@@ -199,19 +428,18 @@ def create_app():
         }
 
         # Host directory structure
-        root = Path(server_data_dir(server.slug))
-        config_dir = root / "config"
-        server_dir = root / "server"
-        backups_dir = root / "backups"
+        root = server_data_dir(server.slug)
+        config_dir = os.path.join(root, "config")
+        server_dir = os.path.join(root, "server")
+        backups_dir = os.path.join(root, "backups")
 
-        config_dir.mkdir(parents=True, exist_ok=True)
-        server_dir.mkdir(parents=True, exist_ok=True)
-        backups_dir.mkdir(parents=True, exist_ok=True)
+        for path in (config_dir, server_dir, backups_dir):
+            os.makedirs(path, exist_ok=True)
 
         volumes = {
-            str(config_dir): {"bind": "/config", "mode": "rw"},
-            str(server_dir): {"bind": "/opt/valheim", "mode": "rw"},
-            str(backups_dir): {"bind": "/backups", "mode": "rw"},
+            config_dir: {"bind": "/config", "mode": "rw"},
+            server_dir: {"bind": "/opt/valheim", "mode": "rw"},
+            backups_dir: {"bind": "/backups", "mode": "rw"},
         }
 
         env = {
@@ -257,12 +485,11 @@ def create_app():
     @app.route("/")
     def index():
         user = current_user()
-        has_admin = User.query.filter_by(role="admin").count() > 0
         return jsonify(
             {
                 "status": "ok",
                 "message": "ValPanel backend running",
-                "has_admin": has_admin,
+                "has_admin": has_admin(),
                 "current_user": user.to_dict() if user else None,
             }
         )
@@ -273,14 +500,11 @@ def create_app():
 
     @app.route("/api/setup", methods=["GET"])
     def setup_info():
-        has_admin = User.query.filter_by(role="admin").count() > 0
-        return jsonify({"has_admin": has_admin})
+        return jsonify({"has_admin": has_admin()})
 
     @app.route("/api/setup/admin", methods=["POST"])
     def setup_create_admin():
-        from werkzeug.security import generate_password_hash
-
-        if User.query.filter_by(role="admin").count() > 0:
+        if has_admin():
             return jsonify({"error": "Admin already exists"}), 400
 
         data = request.get_json(force=True) or {}
@@ -295,15 +519,26 @@ def create_app():
 
         user = User(
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=generate_password_hash(
+                password, method=app.config["PASSWORD_HASH_METHOD"]
+            ),
             role="admin",
         )
         db.session.add(user)
+        # flush() assigns the id; reading it (and to_dict) before commit avoids
+        # the reload that expire-on-commit would otherwise trigger. The session
+        # cookie is only written once the commit has succeeded.
+        db.session.flush()
+        user_id, user_role = user.id, user.role
+        payload = user.to_dict()
         db.session.commit()
+        app.config["_HAS_ADMIN"] = True
 
-        session["user_id"] = user.id
+        session["user_id"] = user_id
+        session["user_role"] = user_role
+        g.user = user
 
-        return jsonify({"message": "Admin created", "user": user.to_dict()}), 201
+        return jsonify({"message": "Admin created", "user": payload}), 201
 
     # ------------------------------------------------------------------
     # Auth: login / logout
@@ -311,8 +546,6 @@ def create_app():
 
     @app.route("/api/auth/login", methods=["POST"])
     def api_login():
-        from werkzeug.security import check_password_hash
-
         data = request.get_json(force=True) or {}
         email = (data.get("email") or "").strip().lower()
         password = data.get("password")
@@ -325,11 +558,15 @@ def create_app():
             return jsonify({"error": "Invalid credentials"}), 401
 
         session["user_id"] = user.id
+        session["user_role"] = user.role
+        g.user = user
         return jsonify({"message": "Logged in", "user": user.to_dict()})
 
     @app.route("/api/auth/logout", methods=["POST"])
     def api_logout():
         session.pop("user_id", None)
+        session.pop("user_role", None)
+        g.pop("user", None)
         return jsonify({"message": "Logged out"})
 
     # ------------------------------------------------------------------
@@ -354,7 +591,7 @@ def create_app():
         if not email:
             return jsonify({"error": "email is required"}), 400
 
-        token = secrets.token_urlsafe(32)
+        token = _b64(os.urandom(32)).rstrip(b"=").decode("ascii")
 
         invite = Invite(
             email=email,
@@ -362,8 +599,6 @@ def create_app():
             token=token,
         )
         if expires_in_hours > 0:
-            from datetime import datetime, timedelta
-
             invite.expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
 
         db.session.add(invite)
@@ -379,26 +614,22 @@ def create_app():
 
     @app.route("/api/invites/<token>", methods=["GET"])
     def get_invite(token):
-        invite = Invite.query.filter_by(token=token).first()
-        if not invite or not invite.is_valid():
+        invite = active_invite(token)
+        if not invite:
             return jsonify({"valid": False}), 404
         return jsonify(
             {
                 "valid": True,
                 "email": invite.email,
                 "role": invite.role,
-                "expires_at": invite.expires_at.isoformat()
-                if invite.expires_at
-                else None,
+                "expires_at": invite.expires_at,
             }
         )
 
     @app.route("/api/register/<token>", methods=["POST"])
     def register_with_invite(token):
-        from werkzeug.security import generate_password_hash
-
-        invite = Invite.query.filter_by(token=token).first()
-        if not invite or not invite.is_valid():
+        invite = active_invite(token)
+        if not invite:
             return jsonify({"error": "Invalid or expired invite"}), 400
 
         data = request.get_json(force=True) or {}
@@ -414,17 +645,24 @@ def create_app():
 
         user = User(
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=generate_password_hash(
+                password, method=app.config["PASSWORD_HASH_METHOD"]
+            ),
             role=invite.role,
         )
         invite.used = True
         db.session.add(user)
         db.session.add(invite)
+        db.session.flush()
+        user_id, user_role = user.id, user.role
+        payload = user.to_dict()
         db.session.commit()
 
-        session["user_id"] = user.id
+        session["user_id"] = user_id
+        session["user_role"] = user_role
+        g.user = user
 
-        return jsonify({"message": "Account created", "user": user.to_dict()})
+        return jsonify({"message": "Account created", "user": payload})
 
     # ------------------------------------------------------------------
     # Server management API
@@ -434,14 +672,20 @@ def create_app():
     @login_required()
     def list_servers():
         servers = Server.query.order_by(Server.id).all()
+        statuses, age, stale = cached_container_statuses()
         result = []
         for s in servers:
-            container = get_container(s.container_name)
-            status = container.status if container else "missing"
+            status = pending_actions.get(s.container_name) or statuses.get(
+                s.container_name, "missing"
+            )
             info = s.to_dict()
             info["container_status"] = status
             result.append(info)
-        return jsonify(result)
+        # Cache metadata goes in headers so the body stays a plain list
+        resp = jsonify(result)
+        resp.headers["X-Status-Cache"] = "stale" if stale else "fresh"
+        resp.headers["X-Status-Cache-Age"] = f"{age:.1f}"
+        return resp
 
     @app.route("/api/servers", methods=["POST"])
     @login_required(role="admin")
@@ -467,23 +711,38 @@ def create_app():
         if existing:
             return jsonify({"error": "Server with this name already exists"}), 400
 
-        try:
-            base_port = allocate_port_block()
-        except RuntimeError as e:
-            return jsonify({"error": str(e)}), 400
-
         container_name = f"valpanel_{slug}"
 
-        server = Server(
-            name=name,
-            slug=slug,
-            world_name=world_name,
-            password=password,
-            base_port=base_port,
-            container_name=container_name,
-        )
-        db.session.add(server)
-        db.session.commit()
+        # base_port is UNIQUE, so if another process took the same slot the
+        # INSERT fails; the slot stays marked as used and we try the next one.
+        for _ in range(PORT_ALLOCATION_RETRIES):
+            try:
+                base_port = allocate_port_block()
+            except RuntimeError as e:
+                return jsonify({"error": str(e)}), 400
+
+            server = Server(
+                name=name,
+                slug=slug,
+                world_name=world_name,
+                password=password,
+                base_port=base_port,
+                container_name=container_name,
+            )
+            db.session.add(server)
+            try:
+                db.session.commit()
+                break
+            except IntegrityError:
+                db.session.rollback()
+                if Server.query.filter_by(slug=slug).first():
+                    release_port_block(base_port)
+                    return (
+                        jsonify({"error": "Server with this name already exists"}),
+                        400,
+                    )
+        else:
+            return jsonify({"error": "Could not allocate a port block"}), 409
 
         # Create and start the container
         try:
@@ -492,6 +751,7 @@ def create_app():
             # Roll back DB entry if container creation fails
             db.session.delete(server)
             db.session.commit()
+            release_port_block(server.base_port)
             return (
                 jsonify(
                     {
@@ -502,6 +762,7 @@ def create_app():
                 500,
             )
 
+        invalidate_status_cache()
         return jsonify(server.to_dict()), 201
 
     @app.route("/api/servers/<int:server_id>/start", methods=["POST"])
@@ -526,6 +787,7 @@ def create_app():
 
         if container.status != "running":
             container.start()
+        invalidate_status_cache()
         return jsonify({"status": "started"})
 
     @app.route("/api/servers/<int:server_id>/stop", methods=["POST"])
@@ -535,9 +797,11 @@ def create_app():
         container = get_container(server.container_name)
         if not container:
             return jsonify({"error": "Container not found"}), 404
-        if container.status == "running":
-            container.stop()
-        return jsonify({"status": "stopped"})
+        if container.status != "running":
+            return jsonify({"status": "stopped"})
+        # Stopping waits out the world save; don't hold a request worker for it
+        run_docker_action(container, "stop")
+        return jsonify({"status": "stopping"}), 202
 
     @app.route("/api/servers/<int:server_id>/restart", methods=["POST"])
     @login_required()
@@ -546,8 +810,8 @@ def create_app():
         container = get_container(server.container_name)
         if not container:
             return jsonify({"error": "Container not found"}), 404
-        container.restart()
-        return jsonify({"status": "restarted"})
+        run_docker_action(container, "restart")
+        return jsonify({"status": "restarting"}), 202
 
     # ------------------------------------------------------------------
     # DELETE SERVER
@@ -561,8 +825,6 @@ def create_app():
           - Delete its data directory
           - Remove DB entry
         """
-        import shutil
-
         server = Server.query.get_or_404(server_id)
 
         # Remove container
@@ -576,26 +838,34 @@ def create_app():
                     f"Failed to remove container {server.container_name}: {e.explanation}"
                 )
 
-        # Delete folder
-        server_root = Path(server_data_dir(server.slug))
-        if server_root.exists():
-            app.logger.info(f"Deleting directory: {server_root}")
+        # Delete folder. Move it aside first so a new server with the same
+        # slug can't collide with it, then remove it in the background.
+        server_root = server_data_dir(server.slug)
+        if os.path.exists(server_root):
+            doomed = os.path.join(
+                app.config["DATA_ROOT"], f".{server.slug}.deleting-{server.id}"
+            )
             try:
-                shutil.rmtree(server_root)
-            except Exception as e:
-                app.logger.error(f"Failed to delete directory {server_root}: {e}")
+                os.rename(server_root, doomed)
+            except OSError as e:
+                app.logger.error(f"Failed to move directory {server_root}: {e}")
+                doomed = server_root
+            app.logger.info(f"Deleting directory: {server_root}")
+            remove_tree(doomed)
 
         # Remove DB entry
         db.session.delete(server)
         db.session.commit()
+        release_port_block(server.base_port)
 
-        return jsonify({"status": "deleted", "server_id": server_id}), 200
+        invalidate_status_cache()
+        return jsonify({"status": "deleting", "server_id": server_id}), 202
 
     @app.route("/api/servers/<int:server_id>/logs", methods=["GET"])
     @login_required()
     def get_server_logs(server_id):
         """
-        Return recent Docker logs for the given server.
+        Stream recent Docker logs for the given server as text/plain.
         Optional `tail` query param (default 500, max 5000) controls how many lines to fetch.
         """
         tail = request.args.get("tail", default=500, type=int)
@@ -607,11 +877,16 @@ def create_app():
             return jsonify({"error": "Container not found"}), 404
 
         try:
-            logs = container.logs(tail=tail).decode("utf-8", errors="replace")
+            # follow=False: stream what's there now instead of tailing forever
+            chunks = container.logs(tail=tail, stream=True, follow=False)
         except Exception as e:
             return jsonify({"error": f"Failed to read logs: {str(e)}"}), 500
 
-        return jsonify({"logs": logs, "tail": tail})
+        return Response(
+            chunks,
+            mimetype="text/plain",
+            headers={"X-Log-Tail": str(tail)},
+        )
 
 
 
@@ -622,7 +897,7 @@ def create_app():
     @app.route("/setup")
     def setup_page():
         # If admin already exists, skip to dashboard
-        if User.query.filter_by(role="admin").count() > 0:
+        if has_admin():
             return redirect(url_for("dashboard_page"))
         return render_template("setup_admin.html")
 
@@ -27,10 +27,28 @@ class Config:
     # Host path is provided via Docker volumes.
     DATA_ROOT = os.getenv("DATA_ROOT", "/servers")
 
+    # Connections kept open to the Docker daemon socket. docker-py defaults to
+    # 10, which makes concurrent dashboard requests queue behind each other.
+    DOCKER_MAX_POOL_SIZE = int(os.getenv("DOCKER_MAX_POOL_SIZE", "64"))
+
+    # How long (seconds) /api/servers serves cached container statuses before
+    # refreshing them from the Docker daemon in the background.
+    STATUS_CACHE_TTL = float(os.getenv("STATUS_CACHE_TTL", "3"))
+    # Snapshots older than this are never served; the request fetches fresh
+    # statuses instead (e.g. the first page view after an idle period).
+    STATUS_CACHE_MAX_AGE = float(
+        os.getenv("STATUS_CACHE_MAX_AGE", str(STATUS_CACHE_TTL * 5))
+    )
+
     # ------------------------------------------------------------------
     # Flask / session
     # ------------------------------------------------------------------
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-change-me")  # change via env in prod
 
+    # werkzeug hash method for new passwords ("scrypt:N:r:p"). werkzeug's own
+    # default is scrypt with N=32768; N=16384 halves the CPU/memory per login.
+    # Hashes made with other parameters still verify.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:16384:8:1")
+
     # Later: you can add MAIL_* settings for invite emails, etc.
 
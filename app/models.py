@@ -6,6 +6,9 @@ db = SQLAlchemy()
 
 class Server(db.Model):
     __tablename__ = "servers"
+    # An index rather than unique=True so startup can add it to existing
+    # databases (create_all() never alters tables that already exist).
+    __table_args__ = (db.Index("uq_servers_base_port", "base_port", unique=True),)
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), nullable=False)
@@ -29,8 +32,8 @@ class Server(db.Model):
             "world_name": self.world_name,
             "base_port": self.base_port,
             "container_name": self.container_name,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
 
 
@@ -48,7 +51,7 @@ class User(db.Model):
             "id": self.id,
             "email": self.email,
             "role": self.role,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self.created_at,
         }
 
 
@@ -63,13 +66,6 @@ class Invite(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime, nullable=True)
 
-    def is_valid(self) -> bool:
-        if self.used:
-            return False
-        if self.expires_at and datetime.utcnow() > self.expires_at:
-            return False
-        return True
-
     def to_dict(self):
         return {
             "id": self.id,
@@ -77,7 +73,7 @@ class Invite(db.Model):
             "role": self.role,
             "token": self.token,
             "used": self.used,
-            "created_at": self.created_at.isoformat(),
-            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "created_at": self.created_at,
+            "expires_at": self.expires_at,
         }
 